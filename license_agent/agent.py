@@ -17,9 +17,11 @@
 """Agent for managing Gemini Enterprise / NotebookLM Enterprise licenses."""
 
 import os
-from typing import List, Optional, Dict, Any
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import TYPE_CHECKING, Iterable, List, Optional, Dict, Any, Tuple
 from datetime import datetime, timezone, timedelta
-from dateutil.parser import parse as parse_datetime
 
 import logging
 
@@ -27,11 +29,17 @@ import logging
 logger = logging.getLogger(__name__)
 
 from google.adk.agents.llm_agent import Agent
-from google.cloud import discoveryengine_v1
+from google.api_core import exceptions as api_exceptions
 import google.auth
 import google.auth.exceptions
 from google.auth.transport import requests as auth_requests
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+if TYPE_CHECKING:
+    # Imported lazily at runtime; see _get_user_license_client().
+    from google.cloud import discoveryengine_v1
 
 # --- Constants ---
 PROJECT_ID = os.environ.get("GOOGLE_CLOUD_PROJECT")
@@ -40,11 +48,89 @@ SUBSCRIPTION_ID = os.environ.get("SUBSCRIPTION_ID")
 USER_STORE_ID = "default_user_store"  # Fixed value as per user instruction
 BASE_API_URL = "https://global-discoveryengine.googleapis.com"
 
+MAX_FANOUT_WORKERS = 16  # Concurrent per-subscription detail requests
+SUBSCRIPTIONS_CACHE_TTL_SECS = 30  # How long list_subscriptions results are reused
+SUBSCRIPTION_DETAILS_CACHE_TTL_SECS = 300  # How long subscription details are reused
+REVOKE_BATCH_SIZE = 1000  # Max user licenses per batch update request
+LIST_PAGE_SIZE = 50  # Max page size accepted by ListUserLicenses
+HTTP_MAX_RETRIES = 5  # Retries for throttled or failed REST GETs
+RETRY_BACKOFF_CAP_SECS = 8.0  # Upper bound on a single retry wait
+REPLAY_CACHE_TTL_SECS = 10  # How long repeated grant/revoke calls are answered from cache
+
+if not PROJECT_ID:
+    raise RuntimeError("The GOOGLE_CLOUD_PROJECT environment variable must be set.")
+
+# Invariant parts of the REST requests, built once instead of per call.
+_V1_PREFIX = BASE_API_URL + "/v1/"
+_COMMON_HEADERS = {"X-Goog-User-Project": PROJECT_ID}
+_USAGE_STATS_URL = (
+    f"{BASE_API_URL}/v1/projects/{PROJECT_ID}/locations/{LOCATION}/"
+    f"userStores/{USER_STORE_ID}/licenseConfigsUsageStats"
+)
+# Parent resource of all user license requests.
+_USER_STORE_PATH = (
+    f"projects/{PROJECT_ID}/locations/{LOCATION}/userStores/{USER_STORE_ID}"
+)
+
+# Shared authorized session, created on first use so that credentials are
+# loaded once and keep-alive connections are reused across tool calls.
+_SESSION: Optional[auth_requests.AuthorizedSession] = None
+_SESSION_LOCK = threading.Lock()
+
+# Recent list_subscriptions results, keyed by (project, location, user store,
+# verbose) and stored as (monotonic timestamp, result) pairs. The cache lock
+# only guards the dict and generation counter and is never held during a
+# fetch; the fetch lock lets a single fetch run at a time. The generation is
+# bumped on every invalidation, so a fetch that overlapped a license change
+# does not store its outdated result.
+_SUBSCRIPTIONS_CACHE: Dict[tuple, tuple] = {}
+_SUBSCRIPTIONS_CACHE_LOCK = threading.Lock()
+_SUBSCRIPTIONS_CACHE_GENERATION = 0
+_SUBSCRIPTIONS_FETCH_LOCK = threading.Lock()
+
+# Subscription details keyed by resource name, stored as
+# (monotonic timestamp, details) pairs.
+_SUBSCRIPTION_DETAILS_CACHE: Dict[str, tuple] = {}
+_SUBSCRIPTION_DETAILS_CACHE_LOCK = threading.Lock()
+
+# Shared User License API client, created on first use so that channel setup
+# happens once per process.
+_USER_LICENSE_CLIENT: Optional["discoveryengine_v1.UserLicenseServiceClient"] = None
+_USER_LICENSE_CLIENT_LOCK = threading.Lock()
+
+# Recent successful grant_license / revoke_license results, stored as
+# (monotonic timestamp, result) pairs so that immediate retries of the same
+# call skip the API. Grants are keyed by (user_id, license_config_path);
+# revocations ignore the config path, so they are keyed by (user_id,). Writes
+# happen from the revocation worker threads, hence the lock.
+_GRANT_CACHE: Dict[tuple, tuple] = {}
+_REVOKE_CACHE: Dict[tuple, tuple] = {}
+_REPLAY_CACHE_LOCK = threading.RLock()
+
+# Whether ListUserLicenses accepts a last_login_time filter. Cleared the first
+# time the backend rejects it, so later calls don't repeat a failing request.
+_LOGIN_TIME_FILTER_SUPPORTED = True
+
+
+class _CappedRetry(Retry):
+    """Retry policy that caps how long a `Retry-After` header can make us wait.
+
+    Callers of `list_subscriptions` wait on the fetch in progress, so a single
+    throttled request must not stall them for the full server-requested delay.
+    """
+
+    def get_retry_after(self, response: Any) -> Optional[float]:
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, RETRY_BACKOFF_CAP_SECS)
+
 
 def _create_authed_session() -> Optional[auth_requests.AuthorizedSession]:
     """Creates a requests session with Google Cloud authentication.
 
-    The session automatically handles token refreshing.
+    The session automatically handles token refreshing, refreshing tokens in
+    the background shortly before they expire.
 
     Returns:
         An authorized session object, or None if credentials could not be
@@ -54,6 +140,9 @@ def _create_authed_session() -> Optional[auth_requests.AuthorizedSession]:
         credentials, _ = google.auth.default(
             scopes=["https://www.googleapis.com/auth/cloud-platform"]
         )
+        # Refresh stale tokens on a background thread while the still-valid
+        # token keeps being used, instead of blocking a tool call on expiry.
+        credentials.with_non_blocking_refresh()
         return auth_requests.AuthorizedSession(credentials)
     except google.auth.exceptions.DefaultCredentialsError as e:
         logger.error(f"Error getting default credentials: {e}")
@@ -64,24 +153,65 @@ def _create_authed_session() -> Optional[auth_requests.AuthorizedSession]:
         return None
 
 
-def _get_subscription_details(
-    session: requests.Session, subscription_name: str
-) -> Optional[Dict[str, Any]]:
-    """Fetches details for a single Subscription resource via REST API.
+def _get_session() -> Optional[auth_requests.AuthorizedSession]:
+    """Returns the shared authorized session, creating it on first use.
+
+    The session is mounted with a connection pool matching the subscription
+    detail fan-out in `list_subscriptions`, and retries GETs that are
+    throttled or fail transiently.
+
+    Returns:
+        The shared authorized session, or None if credentials could not be
+        obtained. A failed attempt is not cached, so the next call retries.
+    """
+    global _SESSION
+    with _SESSION_LOCK:
+        if _SESSION is None:
+            session = _create_authed_session()
+            if session is None:
+                return None
+            # All REST calls go to a single host. Sizing the pool to the
+            # fan-out width and blocking when it is exhausted keeps every
+            # request on a pooled keep-alive connection, instead of opening
+            # extra connections that are discarded after one use.
+            session.mount(
+                "https://",
+                HTTPAdapter(
+                    pool_connections=1,
+                    pool_maxsize=MAX_FANOUT_WORKERS,
+                    pool_block=True,
+                    max_retries=_CappedRetry(
+                        total=HTTP_MAX_RETRIES,
+                        backoff_factor=0.5,
+                        backoff_max=RETRY_BACKOFF_CAP_SECS,
+                        # Keeps fan-out requests throttled together from
+                        # retrying in lockstep.
+                        backoff_jitter=0.5,
+                        status_forcelist=[429, 500, 502, 503, 504],
+                        allowed_methods=["GET"],
+                        respect_retry_after_header=True,
+                        # Return the final error response so callers can
+                        # report its status code and content.
+                        raise_on_status=False,
+                    ),
+                ),
+            )
+            _SESSION = session
+        return _SESSION
+
+
+def _get_json(session: requests.Session, url: str) -> Optional[Dict[str, Any]]:
+    """Fetches a REST API resource and decodes its JSON body.
 
     Args:
         session: The authorized requests session to use for the API call.
-        subscription_name: The full resource name of the subscription.
+        url: The full URL of the resource.
 
     Returns:
-        A dictionary containing the subscription details, or None if an
-        error occurred.
+        The decoded response body, or None if an error occurred.
     """
-    headers = {"X-Goog-User-Project": PROJECT_ID}
-    url = f"{BASE_API_URL}/v1/{subscription_name}"
-
     try:
-        response = session.get(url, headers=headers)
+        response = session.get(url, headers=_COMMON_HEADERS)
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
@@ -96,6 +226,140 @@ def _get_subscription_details(
         return None
 
 
+def _get_subscription_details(
+    session: requests.Session, subscription_name: str, force_refresh: bool = False
+) -> Optional[Dict[str, Any]]:
+    """Fetches details for a single Subscription resource via REST API.
+
+    Details rarely change, so successful responses are cached for
+    `SUBSCRIPTION_DETAILS_CACHE_TTL_SECS` seconds.
+
+    Args:
+        session: The authorized requests session to use for the API call.
+        subscription_name: The full resource name of the subscription.
+        force_refresh: If True, bypass the cache and fetch fresh details.
+
+    Returns:
+        A dictionary containing the subscription details, or None if an
+        error occurred.
+    """
+    if not force_refresh:
+        # Lock-free read; a single dict lookup is atomic.
+        cached = _SUBSCRIPTION_DETAILS_CACHE.get(subscription_name)
+        if cached and time.monotonic() - cached[0] < SUBSCRIPTION_DETAILS_CACHE_TTL_SECS:
+            return cached[1]
+
+    details = _get_json(session, _V1_PREFIX + subscription_name)
+    if details is not None:
+        with _SUBSCRIPTION_DETAILS_CACHE_LOCK:
+            _SUBSCRIPTION_DETAILS_CACHE[subscription_name] = (time.monotonic(), details)
+    return details
+
+
+def _get_user_license_client() -> "discoveryengine_v1.UserLicenseServiceClient":
+    """Returns the shared User License API client, creating it on first use.
+
+    The `discoveryengine_v1` package is slow to import, so it is only
+    imported once a tool actually needs it rather than at agent startup.
+
+    Returns:
+        The shared `UserLicenseServiceClient`.
+    """
+    global _USER_LICENSE_CLIENT
+    with _USER_LICENSE_CLIENT_LOCK:
+        if _USER_LICENSE_CLIENT is None:
+            from google.cloud import discoveryengine_v1
+
+            _USER_LICENSE_CLIENT = discoveryengine_v1.UserLicenseServiceClient()
+        return _USER_LICENSE_CLIENT
+
+
+def _to_dict(message: Any) -> dict:
+    """Converts an API response message to a dictionary.
+
+    Enums are reported by name rather than by number, which is easier for
+    the agent to present.
+
+    Args:
+        message: A proto-plus message returned by the client library.
+
+    Returns:
+        The message represented as a dictionary.
+    """
+    return type(message).to_dict(message, use_integers_for_enums=False)
+
+
+def _get_recent_result(cache: Dict[tuple, tuple], key: tuple) -> Optional[dict]:
+    """Returns a cached grant/revoke result if it is still fresh.
+
+    Args:
+        cache: The replay cache to look in.
+        key: The cache key of the call, starting with the user_id.
+
+    Returns:
+        The cached result, or None if there is no fresh entry.
+    """
+    # Lock-free read; a single dict lookup is atomic.
+    cached = cache.get(key)
+    if cached and time.monotonic() - cached[0] < REPLAY_CACHE_TTL_SECS:
+        return cached[1]
+    return None
+
+
+def _record_result(cache: Dict[tuple, tuple], key: tuple, result: dict) -> None:
+    """Caches a successful grant/revoke result for replays of the same call.
+
+    Any other cached results for the user are dropped first, since they no
+    longer describe the user's current license.
+
+    Args:
+        cache: The replay cache to store the result in.
+        key: The cache key of the call, starting with the user_id.
+        result: The result returned to the caller.
+    """
+    with _REPLAY_CACHE_LOCK:
+        _forget_user(key[0])
+        if not result.get("error_samples"):
+            cache[key] = (time.monotonic(), result)
+
+
+def _forget_user(user_id: str) -> None:
+    """Drops all cached grant/revoke results for a user.
+
+    Args:
+        user_id: The unique identifier of the user whose license changed.
+    """
+    with _REPLAY_CACHE_LOCK:
+        for cache in (_GRANT_CACHE, _REVOKE_CACHE):
+            for key in [key for key in cache if key[0] == user_id]:
+                del cache[key]
+
+
+def _iter_user_licenses(
+    filter: Optional[str] = None,
+) -> Iterable["discoveryengine_v1.UserLicense"]:
+    """Lazily iterates over the user licenses in the configured user store.
+
+    The first page is requested immediately, so an invalid `filter` raises
+    here; further pages are fetched on demand. Licenses are yielded as proto
+    objects, so callers that only inspect a few fields avoid dict conversion.
+
+    Args:
+        filter: An optional server-side filter expression.
+
+    Returns:
+        An iterable over the matching user licenses.
+    """
+    from google.cloud import discoveryengine_v1
+
+    client = _get_user_license_client()
+    parent = _USER_STORE_PATH
+    request = discoveryengine_v1.ListUserLicensesRequest(
+        parent=parent, filter=filter, page_size=LIST_PAGE_SIZE
+    )
+    return client.list_user_licenses(request=request)
+
+
 # --- Tool Functions ---
 
 
@@ -105,12 +369,7 @@ def list_licenses() -> List[dict]:
     Returns:
         A list of user license objects, each represented as a dictionary.
     """
-    client = discoveryengine_v1.UserLicenseServiceClient()
-    parent = client.user_store_path(
-        project=PROJECT_ID, location=LOCATION, user_store=USER_STORE_ID
-    )
-    request = discoveryengine_v1.ListUserLicensesRequest(parent=parent)
-    return [type(p).to_dict(p) for p in client.list_user_licenses(request=request)]
+    return [_to_dict(p) for p in _iter_user_licenses()]
 
 
 def grant_license(user_id: str, license_config_path: Optional[str] = None) -> dict:
@@ -133,7 +392,15 @@ def grant_license(user_id: str, license_config_path: Optional[str] = None) -> di
             )
         }
 
-    client = discoveryengine_v1.UserLicenseServiceClient()
+    # Immediate retries of the same grant are answered without a new operation.
+    cache_key = (user_id, license_config_path)
+    cached_result = _get_recent_result(_GRANT_CACHE, cache_key)
+    if cached_result is not None:
+        return cached_result
+
+    from google.cloud import discoveryengine_v1
+
+    client = _get_user_license_client()
     user_license_obj = discoveryengine_v1.UserLicense(
         user_principal=user_id, license_config=license_config_path
     )
@@ -141,9 +408,7 @@ def grant_license(user_id: str, license_config_path: Optional[str] = None) -> di
         user_licenses=[user_license_obj]
     )
 
-    parent = client.user_store_path(
-        project=PROJECT_ID, location=LOCATION, user_store=USER_STORE_ID
-    )
+    parent = _USER_STORE_PATH
 
     request = discoveryengine_v1.BatchUpdateUserLicensesRequest(
         inline_source=inline_source,
@@ -152,7 +417,10 @@ def grant_license(user_id: str, license_config_path: Optional[str] = None) -> di
     )
     operation = client.batch_update_user_licenses(request=request)
     response = operation.result()
-    return type(response).to_dict(response)
+    result = _to_dict(response)
+    _record_result(_GRANT_CACHE, cache_key, result)
+    _invalidate_subscriptions_cache()
+    return result
 
 def revoke_license(user_id: str, license_config_path: Optional[str] = None) -> dict:
     """Revokes a license from a specific user.
@@ -173,7 +441,15 @@ def revoke_license(user_id: str, license_config_path: Optional[str] = None) -> d
             )
         }
 
-    client = discoveryengine_v1.UserLicenseServiceClient()
+    # Immediate retries of the same revocation are answered without a new operation.
+    cache_key = (user_id,)
+    cached_result = _get_recent_result(_REVOKE_CACHE, cache_key)
+    if cached_result is not None:
+        return cached_result
+
+    from google.cloud import discoveryengine_v1
+
+    client = _get_user_license_client()
     user_license_obj = discoveryengine_v1.UserLicense(
         user_principal=user_id
     )
@@ -181,9 +457,7 @@ def revoke_license(user_id: str, license_config_path: Optional[str] = None) -> d
         user_licenses=[user_license_obj]
     )
 
-    parent = client.user_store_path(
-        project=PROJECT_ID, location=LOCATION, user_store=USER_STORE_ID
-    )
+    parent = _USER_STORE_PATH
 
     request = discoveryengine_v1.BatchUpdateUserLicensesRequest(
         inline_source=inline_source,
@@ -192,7 +466,42 @@ def revoke_license(user_id: str, license_config_path: Optional[str] = None) -> d
     )
     operation = client.batch_update_user_licenses(request=request)
     response = operation.result()
-    return type(response).to_dict(response)
+    result = _to_dict(response)
+    _record_result(_REVOKE_CACHE, cache_key, result)
+    _invalidate_subscriptions_cache()
+    return result
+
+
+def _revoke_licenses_batch(
+    user_ids: List[str],
+) -> "discoveryengine_v1.BatchUpdateUserLicensesResponse":
+    """Revokes the licenses of several users with a single batch update.
+
+    Args:
+        user_ids: The unique identifiers of the users whose licenses to revoke.
+
+    Returns:
+        The response of the completed batch update operation.
+    """
+    from google.cloud import discoveryengine_v1
+
+    client = _get_user_license_client()
+    inline_source = discoveryengine_v1.BatchUpdateUserLicensesRequest.InlineSource(
+        user_licenses=[
+            discoveryengine_v1.UserLicense(user_principal=user_id)
+            for user_id in user_ids
+        ]
+    )
+
+    parent = _USER_STORE_PATH
+
+    request = discoveryengine_v1.BatchUpdateUserLicensesRequest(
+        inline_source=inline_source,
+        delete_unassigned_user_licenses=True,
+        parent=parent,
+    )
+    operation = client.batch_update_user_licenses(request=request)
+    return operation.result()
 
 
 def release_stale_licenses(stale_after_days: int) -> dict:
@@ -208,63 +517,165 @@ def release_stale_licenses(stale_after_days: int) -> dict:
                           never logged in.
 
     Returns:
-        A dictionary summarizing the actions taken, including a list of users
-        whose licenses were revoked.
+        A dictionary summarizing the actions taken, including lists of users
+        whose licenses were revoked and of stale users whose revocation failed.
     """
+    global _LOGIN_TIME_FILTER_SUPPORTED
+
     now = datetime.now(timezone.utc)
     stale_threshold = now - timedelta(days=stale_after_days)
+    # Compared against raw Timestamp seconds, avoiding a datetime per license.
+    stale_threshold_ts = int(stale_threshold.timestamp())
+    stale_users = []  # (user_id, license_config) pairs
     revoked_users = []
+    failed_users = []
     errors = []
 
+    # Ask the backend to return only assigned licenses, which it supports
+    # filtering on, and try to push the last login predicate down as well.
+    # The checks below are still applied, so results stay correct if the
+    # login filter is unsupported.
+    assigned_filter = "license_assignment_state = ASSIGNED"
+    if stale_after_days == -1:
+        login_filter = "NOT has(last_login_time)"
+    else:
+        login_filter = (
+            f'last_login_time < "{stale_threshold.strftime("%Y-%m-%dT%H:%M:%SZ")}"'
+        )
+
     try:
-        all_licenses = list_licenses()
+        if _LOGIN_TIME_FILTER_SUPPORTED:
+            try:
+                user_licenses = _iter_user_licenses(
+                    filter=f"{assigned_filter} AND {login_filter}"
+                )
+            except api_exceptions.InvalidArgument as e:
+                # Remember the rejection so later runs skip the extra call.
+                logger.info(
+                    f"Server-side last login filter rejected ({e}). "
+                    "Filtering client-side."
+                )
+                _LOGIN_TIME_FILTER_SUPPORTED = False
+        if not _LOGIN_TIME_FILTER_SUPPORTED:
+            user_licenses = _iter_user_licenses(filter=assigned_filter)
+
+        for user_license in user_licenses:
+            # Read fields from the underlying protobuf to skip proto-plus
+            # conversions on every access.
+            user_license_pb = type(user_license).pb(user_license)
+            user_id = user_license_pb.user_principal
+            license_config = user_license_pb.license_config
+            has_logged_in = user_license_pb.HasField("last_login_time")
+
+            if not user_id or not license_config:
+                errors.append(
+                    f"Skipping license with missing user_id or config: "
+                    f"user_id='{user_id}', license_config='{license_config}'"
+                )
+                continue
+
+            # Handle "Never Logged In" case (stale_after_days == -1)
+            if stale_after_days == -1:
+                if not has_logged_in:
+                    logger.info(f"Found user {user_id} who has never logged in. Revoking...")
+                    stale_users.append((user_id, license_config))
+                continue
+
+            # Handle "Stale" case (stale_after_days > 0)
+            if not has_logged_in:
+                # If checking for staleness, skip users who have never logged in (or handle differently if desired)
+                continue
+
+            last_login_ts = user_license_pb.last_login_time.seconds
+            if last_login_ts < stale_threshold_ts:
+                last_login_time = datetime.fromtimestamp(last_login_ts, timezone.utc)
+                logger.info(
+                    f"Found stale license for user {user_id} (last login: "
+                    f"{last_login_time.strftime('%Y-%m-%d')}). Revoking..."
+                )
+                stale_users.append((user_id, license_config))
     except Exception as e:
         return {"error": f"Failed to retrieve license list: {e}"}
 
-    for license_info in all_licenses:
-        user_id = license_info.get("user_principal")
-        last_login_str = license_info.get("last_login_time")
-        license_config = license_info.get("license_config")
-
-        if not user_id or not license_config:
-            errors.append(f"Skipping license with missing user_id or config: {license_info}")
-            continue
-
-        # Handle "Never Logged In" case (stale_after_days == -1)
-        if stale_after_days == -1:
-            if not last_login_str:
-                logger.info(f"Found user {user_id} who has never logged in. Revoking...")
-                try:
-                    revoke_license(user_id=user_id, license_config_path=license_config)
-                    revoked_users.append(user_id)
-                except Exception as e:
-                    errors.append(f"Failed to revoke license for '{user_id}': {e}")
-            continue
-
-        # Handle "Stale" case (stale_after_days > 0)
-        if not last_login_str:
-            # If checking for staleness, skip users who have never logged in (or handle differently if desired)
-            continue
-
-        try:
-            last_login_time = parse_datetime(last_login_str)
-        except (ValueError, TypeError):
-            errors.append(
-                f"Skipping user '{user_id}' due to invalid last_login_time: "
-                f"'{last_login_str}'"
-            )
-            continue
+    # Revoke in as few batch updates as possible rather than one long-running
+    # operation per user.
+    batches = [
+        stale_users[i:i + REVOKE_BATCH_SIZE]
+        for i in range(0, len(stale_users), REVOKE_BATCH_SIZE)
+    ]
+    unbatched_users = []
+    with ThreadPoolExecutor(max_workers=MAX_FANOUT_WORKERS) as executor:
+        futures = {
+            executor.submit(
+                _revoke_licenses_batch, [user_id for user_id, _ in batch]
+            ): batch
+            for batch in batches
+        }
+        for future in as_completed(futures):
+            batch = futures[future]
+            try:
+                response = future.result()
+            except api_exceptions.InvalidArgument as e:
+                # Likely caused by a bad entry, so the other users in the
+                # batch can still be revoked individually.
+                logger.warning(
+                    f"Batch revocation of {len(batch)} licenses failed: {e}. "
+                    "Revoking individually..."
+                )
+                unbatched_users.extend(batch)
+                continue
+            except Exception as e:
+                # Errors such as permission, quota or timeouts would fail
+                # every per-user call as well, so don't multiply them.
+                errors.append(f"Failed to revoke licenses for {len(batch)} users: {e}")
+                for user_id, _ in batch:
+                    # The batch may still have been partly applied server-side.
+                    _forget_user(user_id)
+                    failed_users.append(user_id)
+                continue
+            if response.error_samples:
+                # The samples do not say which entries failed, so find out by
+                # revoking this batch's users individually.
+                logger.warning(
+                    f"Batch revocation of {len(batch)} licenses reported errors: "
+                    f"{[sample.message for sample in response.error_samples]}. "
+                    "Revoking individually..."
+                )
+                unbatched_users.extend(batch)
+                continue
+            for user_id, _ in batch:
+                _forget_user(user_id)
+                revoked_users.append(user_id)
 
-        if last_login_time < stale_threshold:
-            logger.info(
-                f"Found stale license for user {user_id} (last login: "
-                f"{last_login_time.strftime('%Y-%m-%d')}). Revoking..."
-            )
+    # Fall back to per-user revocations for batches rejected because of their
+    # entries, so that a single bad entry does not block the rest and errors
+    # are reported per user.
+    with ThreadPoolExecutor(max_workers=MAX_FANOUT_WORKERS) as executor:
+        futures = {
+            executor.submit(
+                revoke_license, user_id=user_id, license_config_path=license_config
+            ): user_id
+            for user_id, license_config in unbatched_users
+        }
+        for future in as_completed(futures):
+            user_id = futures[future]
             try:
-                revoke_license(user_id=user_id, license_config_path=license_config)
+                result = future.result()
+                if result.get("error_samples"):
+                    errors.append(
+                        f"Failed to revoke license for '{user_id}': "
+                        f"{result['error_samples']}"
+                    )
+                    failed_users.append(user_id)
+                    continue
                 revoked_users.append(user_id)
             except Exception as e:
                 errors.append(f"Failed to revoke license for '{user_id}': {e}")
+                failed_users.append(user_id)
+
+    if stale_users:
+        # Partially failed batches may still have freed seats.
+        _invalidate_subscriptions_cache()
 
     if not revoked_users and not errors:
         return {"status": "No stale licenses found.", "revoked_count": 0}
@@ -273,47 +684,90 @@ def release_stale_licenses(stale_after_days: int) -> dict:
         "status": f"Completed license reclamation.",
         "revoked_count": len(revoked_users),
         "revoked_users": revoked_users,
+        "failed_users": failed_users,
         "errors": errors,
     }
 
 
-def list_subscriptions() -> dict:
-    """Lists all available subscriptions and their usage stats.
+def _invalidate_subscriptions_cache() -> None:
+    """Drops cached list_subscriptions results after licenses change.
+
+    Seat usage changes with every grant or revocation, and the agent checks
+    it before granting, so cached results must not outlive a change.
+    """
+    global _SUBSCRIPTIONS_CACHE_GENERATION
+    # Only takes the cache lock, so it never waits on a fetch in progress.
+    with _SUBSCRIPTIONS_CACHE_LOCK:
+        _SUBSCRIPTIONS_CACHE.clear()
+        _SUBSCRIPTIONS_CACHE_GENERATION += 1
+
+
+def _fetch_subscriptions(
+    force_refresh: bool = False, verbose: bool = True
+) -> Tuple[dict, bool]:
+    """Fetches all subscriptions and their usage stats via REST API.
+
+    Args:
+        force_refresh: If True, bypass the subscription details cache.
+        verbose: If False, skip the per-subscription detail lookups and
+            return only what the usage stats provide.
 
     Returns:
-        A dictionary containing a list of subscriptions, or an error
-        message if the request fails.
+        A tuple of a dictionary containing a list of subscriptions (or an
+        error message if the request fails), and whether the result is
+        complete. Errors, and lists missing subscriptions whose details
+        could not be fetched, are incomplete and must not be cached.
     """
 
     ## TODO: RESTful approach is temporarily approach due to google-cloud-discoveryengine and google-adk version conflicts
     ## It should be migrate back to function implementation after that
 
-    session = _create_authed_session()
+    session = _get_session()
     if not session:
-        return {"error": "Unable to obtain default credential for API calls."}
+        return {"error": "Unable to obtain default credential for API calls."}, False
 
-    headers = {"X-Goog-User-Project": PROJECT_ID}
-    url = (
-        f"{BASE_API_URL}/v1/projects/{PROJECT_ID}/locations/{LOCATION}/"
-        f"userStores/{USER_STORE_ID}/licenseConfigsUsageStats"
-    )
     subscriptions_data = []
 
     try:
-        response = session.get(url, headers=headers)
+        response = session.get(_USAGE_STATS_URL, headers=_COMMON_HEADERS)
         response.raise_for_status()
         data = response.json()
 
         if "licenseConfigUsageStats" not in data or not data["licenseConfigUsageStats"]:
             logger.info("  No subscriptions usage stats found.")
-            return {"subscriptions": []}
-
-        for stats in data["licenseConfigUsageStats"]:
-            full_name = stats.get("licenseConfig")
-            if not full_name:
-                continue
-
-            subscription_details = _get_subscription_details(session, full_name)
+            return {"subscriptions": []}, True
+
+        stats_list = [
+            stats for stats in data["licenseConfigUsageStats"]
+            if stats.get("licenseConfig")
+        ]
+        full_names = [stats["licenseConfig"] for stats in stats_list]
+
+        if not verbose:
+            return {"subscriptions": [
+                {
+                    "display_name": full_name.split('/')[-1],
+                    "config_path": full_name,
+                    "used_count": int(stats.get("usedLicenseCount", "0")),
+                    "total_count": -1,
+                    "status": "Unknown",
+                    "start_date": "N/A",
+                    "end_date": "N/A",
+                }
+                for stats, full_name in zip(stats_list, full_names)
+            ]}, True
+
+        # The per-subscription detail lookups are independent GETs, so fan
+        # them out instead of paying one round-trip per subscription.
+        with ThreadPoolExecutor(max_workers=MAX_FANOUT_WORKERS) as executor:
+            details_list = list(executor.map(
+                lambda name: _get_subscription_details(session, name, force_refresh),
+                full_names,
+            ))
+
+        for stats, full_name, subscription_details in zip(
+            stats_list, full_names, details_list
+        ):
             if not subscription_details:
                 # Log or handle the case where details for a specific
                 # config could not be fetched.
@@ -330,16 +784,55 @@ def list_subscriptions() -> dict:
                 "end_date": subscription_details.get("endDate", "N/A"),
             })
 
-        return {"subscriptions": subscriptions_data}
+        complete = all(details_list)
+        return {"subscriptions": subscriptions_data}, complete
 
     except requests.exceptions.RequestException as e:
         error_info = {"error": f"Error calling REST API: {e}"}
         if e.response is not None:
             error_info["status_code"] = e.response.status_code
             error_info["response_content"] = e.response.text
-        return error_info
+        return error_info, False
     except Exception as e:
-        return {"error": f"An unexpected error occurred: {e}"}
+        return {"error": f"An unexpected error occurred: {e}"}, False
+
+
+def list_subscriptions(force_refresh: bool = False, verbose: bool = True) -> dict:
+    """Lists all available subscriptions and their usage stats.
+
+    Results are cached for `SUBSCRIPTIONS_CACHE_TTL_SECS` seconds, since the
+    agent typically lists subscriptions again right before granting a license.
+
+    Args:
+        force_refresh: If True, ignore cached results and fetch up-to-date
+            subscriptions and usage stats.
+        verbose: If True, include each subscription's state, seat count and
+            dates. If False, return only names and used seat counts, which
+            takes a single API call.
+
+    Returns:
+        A dictionary containing a list of subscriptions, or an error
+        message if the request fails.
+    """
+    cache_key = (PROJECT_ID, LOCATION, USER_STORE_ID, verbose)
+    # Holding the fetch lock ensures concurrent callers wait for a single
+    # refresh instead of each issuing their own requests.
+    with _SUBSCRIPTIONS_FETCH_LOCK:
+        with _SUBSCRIPTIONS_CACHE_LOCK:
+            cached = _SUBSCRIPTIONS_CACHE.get(cache_key)
+            generation = _SUBSCRIPTIONS_CACHE_GENERATION
+        if (
+            not force_refresh
+            and cached
+            and time.monotonic() - cached[0] < SUBSCRIPTIONS_CACHE_TTL_SECS
+        ):
+            return cached[1]
+
+        result, complete = _fetch_subscriptions(force_refresh, verbose)
+        with _SUBSCRIPTIONS_CACHE_LOCK:
+            if complete and generation == _SUBSCRIPTIONS_CACHE_GENERATION:
+                _SUBSCRIPTIONS_CACHE[cache_key] = (time.monotonic(), result)
+        return result
 
 
 # --- Agent Definition ---
@@ -356,13 +849,21 @@ root_agent = Agent(
 
 *   **Granting a License:**
     *   To grant a license, you must first get a list of available subscriptions
-        by calling the `list_subscriptions` tool.
+        by calling the `list_subscriptions` tool. When the user only needs to pick
+        a subscription by name, call it with `verbose=False`, which is much faster.
     *   Present the `display_name` of each subscription to the user.
     *   Once the user chooses a subscription, you must pass the corresponding
         `config_path` from the chosen subscription to the `grant_license` tool 
         via the `license_config_path` parameter.
-    *   Intelligently guide the user to choose a valid option – one that is `ACTIVE` and has available seats.
-    *   Never grant a license without first confirming availability through usage stats.
+    *   With `verbose=False`, `status` and `total_count` are not available, so do not judge
+        subscriptions by them while the user is picking.
+    *   Never grant a license without first confirming availability. Once the user has chosen,
+        call `list_subscriptions` with `verbose=True` and check that the chosen subscription is
+        `ACTIVE` and has available seats (`used_count` below `total_count`). If it is not,
+        explain why and intelligently guide the user to a valid option.
+    *   Subscription results are briefly cached and refreshed automatically after licenses
+        change. Call `list_subscriptions` with `force_refresh=True` only if the user asks for
+        the very latest data.
 
 *   **Reclaiming Stale Licenses:**
     *   You can automatically reclaim licenses from inactive users by using the